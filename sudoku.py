@@ -1,4 +1,17 @@
+from concurrent.futures import ProcessPoolExecutor
 import random
+import os
+
+# index of the 3x3 square for every square on the board (indexed by row * 9 + col)
+_BOX_OF = bytes((r // 3) * 3 + c // 3 for r in range(9) for c in range(9))
+# bit representing every number in the row, column and 3x3 square bitmasks
+_BIT = tuple(1 << n for n in range(10))
+# canonical solved grid (numbers 0-8, indexed by row * 9 + col), shuffled to generate new boards
+_BASE = bytes((3 * (r % 3) + r // 3 + c) % 9 for r in range(9) for c in range(9))
+# the difficulty level depends on the number of blank squares - change it to modify difficulty
+_DIFFICULTY = (35, 43, 55, 60)
+# number of set bits for every possible candidates bitmask
+_POPCOUNT = tuple(bin(i).count('1') for i in range(1 << 10))
 
 
 class Sudoku:
@@ -6,39 +19,58 @@ class Sudoku:
     Class for creating the sudoku board
     """
     def __init__(self):
-        self._board = [[0 for _ in range(9)] for _ in range(9)]
-        # the difficulty level depends on the number of blank squares - change it to modify difficulty
-        self._difficulty = {0: 35, 1: 43, 2: 55, 3: 60}
+        # the board is stored row by row in a single bytearray (the square in the given row and column is at
+        # row * 9 + col)
+        self._board = bytearray(81)
+        # bitmasks of the numbers used in every row, column and 3x3 square (bit n is set if n is already placed)
+        self._row_masks = [0] * 9
+        self._col_masks = [0] * 9
+        self._box_masks = [0] * 9
 
     def print_board(self):
         """
         Prints the sudoku board in the console
         """
-        for row in self._board:
-            for i in row:
-                print(i, end='  ')
-            print()
+        print('\n'.join(''.join(f'{num}  ' for num in self._board[i:i + 9]) for i in range(0, 81, 9)))
 
-    def _generate_diagonals(self):
+    def _generate_shuffled(self):
         """
-        Generates the three diagonal 3x3 squares on the sudoku board (they are indepentent, so it's simply random choice
-        of 1-9 set for every square)
+        Fills the board with a random solved grid, made by shuffling the bands, stacks, rows and columns of the
+        canonical grid and relabeling its numbers (none of these operations breaks the sudoku rules)
         """
-        nums = set()
-        for x in range(9):
-            if not nums:
-                nums = {i for i in range(1, 10)}
-            start = x - x % 3
-            for y in range(start, start + 3):
-                num = random.choice(tuple(nums))
-                self._board[x][y] = num
-                nums.remove(num)
+        rows = [band * 3 + row for band in random.sample(range(3), 3) for row in random.sample(range(3), 3)]
+        cols = [stack * 3 + col for stack in random.sample(range(3), 3) for col in random.sample(range(3), 3)]
+        nums = random.sample(range(1, 10), 9)
+        self._board[:] = bytes(nums[_BASE[i * 9 + j]] for i in rows for j in cols)
 
     def clear_board(self):
         """
         Fills the entire board with zeros
         """
-        self._board = [[0 for _ in range(9)] for _ in range(9)]
+        self._board[:] = bytes(81)
+        self._row_masks[:] = (0,) * 9
+        self._col_masks[:] = (0,) * 9
+        self._box_masks[:] = (0,) * 9
+
+    def _update_masks(self) -> bool:
+        """
+        Rebuilds the row, column and 3x3 square bitmasks based on the current board
+
+        :return: True if the board is valid, False if any number repeats in a row, column or 3x3 square
+        """
+        self._row_masks = [0] * 9
+        self._col_masks = [0] * 9
+        self._box_masks = [0] * 9
+        for i in range(9):
+            for j in range(9):
+                if self._board[i * 9 + j]:
+                    bit = _BIT[self._board[i * 9 + j]]
+                    if (self._row_masks[i] | self._col_masks[j] | self._box_masks[_BOX_OF[i * 9 + j]]) & bit:
+                        return False
+                    self._row_masks[i] |= bit
+                    self._col_masks[j] |= bit
+                    self._box_masks[_BOX_OF[i * 9 + j]] |= bit
+        return True
 
     def generate(self, diff_chosen: int):
         """
@@ -46,66 +78,104 @@ class Sudoku:
 
         :param diff_chosen: the level of difficulty from 0 to 3 determining the number of blank squares
         """
-        self._generate_diagonals()
-        self._generate_board(0, 0)
+        self._generate_shuffled()
         self._remove_random_fields(diff_chosen)
 
-    def _generate_board(self, i: int, j: int) -> bool:
-        """
-        Fills the empty squares with values using the backtracking algorithm
-
-        :param i: the row of the square to be filled
-        :param j: the column of the square to be filled
-        :return: True if the number leads to the solution, False otherwise
-        """
-        if i == 8 and j == 9:
-            return True
-
-        if j == 9:
-            i += 1
-            j = 0
-
-        # if the given square is not empty, proceed to the next square
-        if self._board[i][j] != 0:
-            return self._generate_board(i, j + 1)
-
-        # check if the each successive number leads to the solution
-        for num in range(1, 10):
-            if self._is_num_valid(i, j, num):
-                self._board[i][j] = num
-
-                if self._generate_board(i, j + 1):
-                    return True
-
-            self._board[i][j] = 0
-
-        return False
-
-    def _is_num_valid(self, row: int, col: int, num: int) -> bool:
+    def solve(self) -> bool:
         """
-        Checks if the number is valid in the given row and column
+        Fills the empty squares of the current board (e.g. after using insert_value) with the valid solution
 
-        :param row: the row of the square to check
-        :param col: the row of the square to check
-        :param num: the number to be checked for validity
-        :return: True if the number in the given square is valid, False otherwise
+        :return: True if the board was solved, False if there is no solution (the board is left unchanged then)
         """
-        if num in self._board[row]:
+        if not self._update_masks():
             return False
+        return self._generate_board()
 
-        for x in self._board:
-            if x[col] == num:
-                return False
-
-        start_row = row - row % 3
-        start_col = col - col % 3
+    @classmethod
+    def generate_many(cls, count: int, diff_chosen: int, workers: int = None) -> list:
+        """
+        Generates the given number of sudoku boards in parallel, using a pool of worker processes
 
-        for i in range(start_row, start_row + 3):
-            for j in range(start_col, start_col + 3):
-                if self._board[i][j] == num:
+        :param count: the number of boards to generate
+        :param diff_chosen: the level of difficulty from 0 to 3 determining the number of blank squares
+        :param workers: the number of worker processes (the number of processors if not given)
+        :return: list of the Sudoku objects with generated boards
+        """
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_generate_single, [diff_chosen] * count, chunksize=max(1, count // workers)))
+
+    def _find_constrained_square(self):
+        """
+        Finds the empty square with the smallest number of candidates (minimum remaining values heuristic)
+
+        :return: row, column and candidates bitmask of the found square (the bitmask is 0 if there is no valid number
+        for the square), or None if the board is completely filled
+        """
+        board = self._board
+        row_masks = self._row_masks
+        col_masks = self._col_masks
+        box_masks = self._box_masks
+        popcount = _POPCOUNT
+        box_of = _BOX_OF
+
+        best = None
+        best_count = 10
+        for i in range(9):
+            row_mask = row_masks[i]
+            offset = i * 9
+            for j in range(9):
+                if board[offset + j] == 0:
+                    available = 0x3FE & ~(row_mask | col_masks[j] | box_masks[box_of[offset + j]])
+                    count = popcount[available]
+                    if count < best_count:
+                        best = (i, j, available)
+                        # there is no valid number for this square, so the board can't be completed, or the square
+                        # has only one option left and can be filled without searching any further
+                        if count <= 1:
+                            return best
+                        best_count = count
+        return best
+
+    def _generate_board(self) -> bool:
+        """
+        Fills the empty squares with values using the iterative backtracking algorithm, always continuing with the
+        most constrained square
+
+        :return: True if the board was filled completely, False if there is no solution
+        """
+        board = self._board
+        row_masks = self._row_masks
+        col_masks = self._col_masks
+        box_masks = self._box_masks
+        box_of = _BOX_OF
+        find_constrained_square = self._find_constrained_square
+
+        # the filled squares with the placed number bit and the candidates that are left to try
+        stack = []
+        while True:
+            square = find_constrained_square()
+            if square is None:
+                return True
+            i, j, available = square
+
+            # go back to the last square which still has untried candidates
+            while not available:
+                if not stack:
                     return False
-
-        return True
+                i, j, bit, available = stack.pop()
+                board[i * 9 + j] = 0
+                row_masks[i] ^= bit
+                col_masks[j] ^= bit
+                box_masks[box_of[i * 9 + j]] ^= bit
+
+            # place the lowest candidate
+            bit = available & -available
+            board[i * 9 + j] = bit.bit_length() - 1
+            row_masks[i] |= bit
+            col_masks[j] |= bit
+            box_masks[box_of[i * 9 + j]] |= bit
+            stack.append((i, j, bit, available ^ bit))
 
     def _remove_random_fields(self, diff_chosen: int):
         """
@@ -114,14 +184,9 @@ class Sudoku:
         :param diff_chosen: the number from range 0-3 determining the number of pre-filled squares on the board (from
         easiest to hardest)
         """
-        for _ in range(self._difficulty[diff_chosen]):
-            field = 0
-            while not field:
-                rand_row = random.randint(0, 8)
-                rand_col = random.randint(0, 8)
-                field = self._board[rand_row][rand_col]
-
-            self._board[rand_row][rand_col] = 0
+        filled = [i for i in range(81) if self._board[i]]
+        for field in random.sample(filled, _DIFFICULTY[diff_chosen]):
+            self._board[field] = 0
 
     @property
     def board(self) -> list:
@@ -130,7 +195,7 @@ class Sudoku:
 
         :return: current sudoku board as a list of lists
         """
-        return self._board
+        return [list(self._board[i:i + 9]) for i in range(0, 81, 9)]
 
     def get_value(self, row: int, col: int) -> int:
         """
@@ -140,7 +205,7 @@ class Sudoku:
         :param col: the col of desired square
         :return: the value of the square with the given coordinates
         """
-        return self._board[row][col]
+        return self._board[row * 9 + col]
 
     def insert_value(self, row: int, col: int, value: int):
         """
@@ -150,5 +215,16 @@ class Sudoku:
         :param col: the column of square to be filled
         :param value: the value to insert into the square
         """
-        self._board[row][col] = value
+        self._board[row * 9 + col] = value
+
 
+def _generate_single(diff_chosen: int) -> Sudoku:
+    """
+    Creates the new Sudoku object and generates its board (used by the worker processes of Sudoku.generate_many)
+
+    :param diff_chosen: the level of difficulty from 0 to 3 determining the number of blank squares
+    :return: Sudoku object with the generated board
+    """
+    sudoku = Sudoku()
+    sudoku.generate(diff_chosen)
+    return sudoku
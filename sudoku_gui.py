@@ -1,9 +1,12 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from itertools import cycle
+from functools import cached_property, lru_cache
 from sudoku import Sudoku
 import pygame
 import json
 import os
+import sys
 
 
 class Timer:
@@ -17,12 +20,18 @@ class Timer:
         self._unpause_time = 0
         self._paused = True
         self._stopped = False
+        # the time (in ms since pygame.init) of the current frame, set by tick
+        self._now = 0
+        # the last prettified time, refreshed once per second
+        self._last_sec = -1
+        self._last_prettified = '00:00'
 
     def pause(self):
         """
         Pause time counting (used for user-initiated stopping)
         """
-        self._pause_time = self._start - (self._unpause_time - pygame.time.get_ticks())
+        self._now = pygame.time.get_ticks()
+        self._pause_time = self._start - (self._unpause_time - self._now)
         self._time += self._pause_time
         self._paused = True
 
@@ -30,7 +39,8 @@ class Timer:
         """
         Unpause time counting
         """
-        self._unpause_time = pygame.time.get_ticks() - self._start
+        self._now = pygame.time.get_ticks()
+        self._unpause_time = self._now - self._start
         self._paused = False
 
     def reset(self):
@@ -48,10 +58,19 @@ class Timer:
         Stops time counting (used for non-user-initiated stopping)
         """
         if not self._stopped:
-            stopped_time = self._start - (self._unpause_time - pygame.time.get_ticks())
+            self._now = pygame.time.get_ticks()
+            stopped_time = self._start - (self._unpause_time - self._now)
             self._time += stopped_time
             self._stopped = True
 
+    def tick(self, now: int):
+        """
+        Sets the time of the current frame, used by every read of the counter until the next tick
+
+        :param now: current time (in ms, as returned by pygame.time.get_ticks)
+        """
+        self._now = now
+
     @property
     def current(self) -> int:
         """
@@ -61,7 +80,7 @@ class Timer:
         """
         if self._paused or self._stopped:
             return self._time
-        return self._time + pygame.time.get_ticks() - self._unpause_time
+        return self._time + self._now - self._unpause_time
 
     @property
     def current_prettified(self) -> str:
@@ -70,9 +89,11 @@ class Timer:
 
         :return: current time of counter (mm:ss)
         """
-        minutes = str(int((self.current / 1000) // 60)).rjust(2, "0")
-        seconds = str(int((self.current / 1000) % 60)).rjust(2, "0")
-        return f'{minutes}:{seconds}'
+        current = self.current
+        if current // 1000 != self._last_sec:
+            self._last_sec = current // 1000
+            self._last_prettified = self.prettify(current)
+        return self._last_prettified
 
     @property
     def paused(self) -> bool:
@@ -91,9 +112,8 @@ class Timer:
         :param time_: time to prettify (in ms)
         :return: time in format MM:SS
         """
-        minutes = str(int((time_ / 1000) // 60)).rjust(2, "0")
-        seconds = str(int((time_ / 1000) % 60)).rjust(2, "0")
-        return f'{minutes}:{seconds}'
+        sec = time_ // 1000
+        return f'{sec // 60:02d}:{sec % 60:02d}'
 
 
 class Screen:
@@ -152,10 +172,42 @@ class Screen:
         return f'Screen {self._title} ({self._width}x{self._height}), active: {self._current}'
 
 
+@lru_cache(maxsize=None)
+def _sysfont(name: str, size: int, bold: bool = False, italic: bool = False) -> pygame.font.Font:
+    """
+    Creates the system font (fonts with the same parameters are created only once and shared)
+
+    :param name: the name of the font
+    :param size: the size of the font
+    :param bold: if the font has to be bold
+    :param italic: if the font has to be italic
+    :return: pygame Font object
+    """
+    return pygame.font.SysFont(name, size, bold=bold, italic=italic)
+
+
+@lru_cache(maxsize=None)
+def _load_image(path: str, size: tuple) -> pygame.Surface:
+    """
+    Loads the image, converts it to the display pixel format and scales it to the given size (every image is read from
+    the disk only once, and it can be called only after the display mode is set)
+
+    :param path: a path to the image
+    :param size: the size of the scaled image
+    :return: the scaled image
+    """
+    return pygame.transform.scale(pygame.image.load(path).convert_alpha(), size)
+
+
 class Button:
     """
     Class for creating the button
     """
+    # rendered button surfaces, shared between the buttons that look the same
+    _SURFACE_CACHE = {}
+    # reused for drawing every part of the button border
+    _BORDER_RECT = pygame.Rect(0, 0, 0, 0)
+
     def __init__(self, position: tuple, size: tuple = None, border: int = 0, border_color: tuple = (0, 0, 0),
                  color: tuple = (255, 255, 255), image_path: str = None, image_size: tuple = None, text: str = None,
                  font: str = "calibri", font_size: int = 18, text_color: tuple = (0, 0, 0), center_text: bool = False,
@@ -174,49 +226,82 @@ class Button:
         :param text_color: the color of the text (RGB)
         :param clickable: if the button is interactive or not
         """
-        self._font = pygame.font.SysFont(font, font_size)
+        self._font = _sysfont(font, font_size)
         self._text_color = text_color
         self._text = text
         self._text_position = (0, 0)
         self._center_text = center_text
         self._color = color
-        self._position = tuple(x - border for x in position)
+        self._position = (position[0] - border, position[1] - border)
         # determining the size of the surface
+        border_2 = border * 2
         if size:
-            self._size = tuple(x + border * 2 for x in size)
+            self._size = (size[0] + border_2, size[1] + border_2)
         elif text and not (image_size and image_path):
-            self._size = tuple(x + border * 2 for x in self._font.size(text))
+            text_width, text_height = self._font.size(text)
+            self._size = (text_width + border_2, text_height + border_2)
         elif text and image_size and image_path:
-            self._size = (self._font.size(text)[0] + image_size[0] + border * 2,
-                          max(self._font.size(text)[1], image_size[1]) + border * 2)
+            text_width, text_height = self._font.size(text)
+            self._size = (text_width + image_size[0] + border_2, max(text_height, image_size[1]) + border_2)
         self._border = border
         self._border_color = border_color
-        self._image = None
         self._image_path = image_path
         self._image_size = image_size if image_size else self._size
         self._clickable = clickable
-        self._surface = pygame.Surface(self._size, flags=pygame.SRCALPHA)
-        self._surface.fill(color)
-        if text:
-            self._draw_text()
-        if border:
-            self._draw_border()
+        # the surface being rendered (the finished one is accessed through the lazily set surface attribute)
+        self._surface = None
         if image_path:
-            self._draw_image()
+            self._rect = self._get_image_rect()
         else:
             self._rect = pygame.Rect(position, self._size)
 
     def __str__(self):
         return f'Button pos. {self._position}'
 
+    def _render(self) -> pygame.Surface:
+        """
+        Gets the button surface matching the current parameters (it is rendered only if it is not in the cache yet)
+
+        :return: the button surface
+        """
+        key = (self._size, self._color, self._border, self._border_color, self._text, self._font, self._text_color,
+               self._center_text, self._image_path, self._image_size)
+        surface = self._SURFACE_CACHE.get(key)
+        if surface is None:
+            self._surface = pygame.Surface(self._size, flags=pygame.SRCALPHA)
+            self._surface.fill(self._color)
+            if self._text:
+                self._draw_text()
+            if self._border:
+                self._draw_border()
+            if self._image_path:
+                self._draw_image()
+            surface = self._SURFACE_CACHE[key] = self._surface
+        return surface
+
+    def _invalidate_surface(self):
+        """
+        Discards the current button surface, so it is rendered again on the next access
+        """
+        self.__dict__.pop('surface', None)
+
+    def _get_image_rect(self) -> pygame.Rect:
+        """
+        Gets the area of the button image on the screen
+
+        :return: pygame Rect object of the image area
+        """
+        rect = pygame.Rect((0, 0), self._image_size)
+        rect.center = (self._size[0] / 2, self._size[1] / 2)
+        return rect.move(*self._position)
+
     def _draw_image(self):
         """
         Draws the image on the button surface
         """
-        self._image = pygame.image.load(self._image_path)
-        self._image = pygame.transform.scale(self._image, self._image_size)
-        self._rect = self._image.get_rect(center=tuple(x / 2 for x in self._size)).move(*self._position)
-        self._surface.blit(self._image, tuple((x - y) / 2 for x, y in zip(self._size, self._image_size)))
+        image = _load_image(self._image_path, self._image_size)
+        self._surface.blit(image, ((self._size[0] - self._image_size[0]) / 2,
+                                   (self._size[1] - self._image_size[1]) / 2))
 
     def _draw_text(self):
         """
@@ -224,32 +309,37 @@ class Button:
         """
         text = self._font.render(self._text, True, self._text_color)
         if self._center_text:
-            self._text_position = tuple((x - y) / 2 for x, y in zip(self._size, text.get_size()))
+            self._text_position = ((self._size[0] - text.get_width()) / 2, (self._size[1] - text.get_height()) / 2)
         self._surface.blit(text, self._text_position)
 
     def _draw_border(self):
         """
         Draws the border on the button surface
         """
+        width, height = self._size
+        # a single Rect moved over the four borders instead of creating the new one for each of them
+        rect = Button._BORDER_RECT
         # left border
-        pygame.draw.rect(self._surface, self._border_color, pygame.Rect((0, 0), (self._border, self._size[1])))
+        rect.update(0, 0, self._border, height)
+        pygame.draw.rect(self._surface, self._border_color, rect)
         # right border
-        pygame.draw.rect(self._surface, self._border_color, pygame.Rect((self._size[0] - self._border, 0),
-                                                                        (self._border, self._size[1])))
+        rect.update(width - self._border, 0, self._border, height)
+        pygame.draw.rect(self._surface, self._border_color, rect)
         # top border
-        pygame.draw.rect(self._surface, self._border_color, pygame.Rect((0, 0), (self._size[0], self._border)))
+        rect.update(0, 0, width, self._border)
+        pygame.draw.rect(self._surface, self._border_color, rect)
         # bottom border
-        pygame.draw.rect(self._surface, self._border_color, pygame.Rect((0, self._size[1] - self._border),
-                                                                        (self._size[0], self._border)))
+        rect.update(0, height - self._border, width, self._border)
+        pygame.draw.rect(self._surface, self._border_color, rect)
 
-    @property
+    @cached_property
     def surface(self) -> pygame.Surface:
         """
-        Getter for the button Surface object
+        Getter for the button Surface object (rendered on the first access after any change of the button look)
 
         :return: button in a form of a pygame Surface object
         """
-        return self._surface
+        return self._render()
 
     @property
     def size(self) -> tuple:
@@ -302,14 +392,13 @@ class Button:
         :param text: the new text to replace the old one
         :param text_color: the new color of the text (RGB)
         """
-        self._surface.fill(self._color)
-        self._text = text if text else self._text
-        self._text_color = text_color if text_color else self._text_color
-        self._draw_text()
-        if self._border:
-            self._draw_border()
-        if self._image_path:
-            self._draw_image()
+        text = text if text else self._text
+        text_color = text_color if text_color else self._text_color
+        # the buttons are updated every frame, so the surface is discarded only if the look has really changed
+        if text != self._text or text_color != self._text_color:
+            self._text = text
+            self._text_color = text_color
+            self._invalidate_surface()
 
     def update_color(self, color: tuple = None, border_color: tuple = None):
         """
@@ -318,15 +407,12 @@ class Button:
         :param color: the new background color of the button (RGB)
         :param border_color: the new border color of the button (RGB)
         """
-        self._surface.fill(self._color)
-        self._color = color if color else self._color
-        self._border_color = border_color if border_color else self._border_color
-        if self._border:
-            self._draw_border()
-        if self._text:
-            self._draw_text()
-        if self._image_path:
-            self._draw_image()
+        color = color if color else self._color
+        border_color = border_color if border_color else self._border_color
+        if color != self._color or border_color != self._border_color:
+            self._color = color
+            self._border_color = border_color
+            self._invalidate_surface()
 
     def update_image(self, image_path: str = None, image_size: tuple = None):
         """
@@ -335,14 +421,10 @@ class Button:
         :param image_path: the path to the new image
         :param image_size: the new size of the button image
         """
-        self._surface.fill(self._color)
         self._image_path = image_path if image_path else self._image_path
         self._image_size = image_size if image_size else self._image_size
-        if self._border:
-            self._draw_border()
-        if self._text:
-            self._draw_text()
-        self._draw_image()
+        self._invalidate_surface()
+        self._rect = self._get_image_rect()
 
     def update_position(self, position: tuple):
         """
@@ -350,15 +432,9 @@ class Button:
 
         :param position: the new position of the button
         """
-        self._surface.fill(self._color)
         self._position = position
-
-        if self._border:
-            self._draw_border()
-        if self._text:
-            self._draw_text()
         if self._image_path:
-            self._draw_image()
+            self._rect = self._get_image_rect()
         else:
             self._rect = pygame.Rect(self._position, self._size)
 
@@ -368,6 +444,9 @@ class SudokuSquare:
     """
     Class representing the single square on the board
     """
+    # the board keeps 81 squares alive for the whole game, so they don't need the per-instance __dict__
+    __slots__ = ('rect', 'color', 'selected', 'at_intersection', 'same_value', 'row', 'col', 'value', 'notes',
+                 'editable', 'is_wrong')
     rect: pygame.Rect
     color: tuple
     selected: bool
@@ -412,6 +491,8 @@ class Move:
     """
     Class representing the single operation on the sudoku board
     """
+    __slots__ = ('prev_number', 'prev_notes', 'row', 'col')
+
     def __init__(self, prev_number: int, prev_notes: list, row: int, col: int):
         """
         :param prev_number: the number in the square before the change
@@ -432,6 +513,15 @@ class SudokuGUI:
     """
     Class for creating GUI version of class Sudoku
     """
+    # indexes (row * 9 + col) of the squares in the same row, column or 3x3 square as the square with the given index,
+    # including the square itself
+    _INTERSECTING = tuple(tuple(sorted({row * 9 + c for c in range(9)} | {r * 9 + col for r in range(9)} |
+                                       {(3 * (row // 3) + i) * 9 + 3 * (col // 3) + j
+                                        for i in range(3) for j in range(3)}))
+                          for row in range(9) for col in range(9))
+    # the selection offsets (rows, columns) for the arrow keys
+    _ARROW_OFFSETS = {pygame.K_UP: (-1, 0), pygame.K_DOWN: (1, 0), pygame.K_LEFT: (0, -1), pygame.K_RIGHT: (0, 1)}
+
     def __init__(self):
         # colors as the RGB codes
         self._COLORS = {
@@ -449,23 +539,33 @@ class SudokuGUI:
             "lightred": (250, 100, 100),
         }
 
-        # numeric keys codes used in pygame
-        self._PY_TO_NUM = {x + 48: x for x in range(1, 10)}
-        self._PY_TO_NUM.update({x + 1073741912: x for x in range(1, 10)})
-        self._NUM_TO_PY = {v: k for k, v in self._PY_TO_NUM.items()}
+        # the mixer channel reserved for the click sound (so playing it doesn't have to look for a free channel)
+        pygame.mixer.set_reserved(1)
+        self._click_channel = pygame.mixer.Channel(0)
+
+        # numeric keys codes used in pygame (indexed by the number)
+        self._NUM_TO_PY = tuple(range(pygame.K_0, pygame.K_9 + 1))
 
         # make directory for keeping statistics
         if not os.path.exists(os.path.expanduser('~/Documents/Sudoku/')):
             os.makedirs(os.path.expanduser('~/Documents/Sudoku/'))
+        # the rendered statistics texts with their positions (rendered again after the stats or the language change)
+        self._stats_blits = None
+        # a single thread writing the statistics files in the order they were saved
+        self._stats_writer = ThreadPoolExecutor(max_workers=1)
+        # the error of the last failed statistics write (raised again when the game is closed)
+        self._stats_error = None
         self._create_stats()
         self._new_record = False
         self._stats_to_save = False
         self._DIFF_TO_STATS = {i: txt for i, txt in zip(range(4), ['easy', 'medium', 'hard', 'expert'])}
 
         # language strings used in the game
-        self._languages = cycle(('pol_PL', 'eng_EN', 'nor_NO', 'spa_ES'))
+        self._languages = ('pol_PL', 'eng_EN', 'nor_NO', 'spa_ES')
+        self._language_strings = tuple(self._load_strings(language) for language in self._languages)
+        self._language_idx = 0
         self._strings = dict()
-        self._change_language(next(self._languages), update=False)
+        self._change_language(self._language_idx, update=False)
 
         # screens
         self._ICON = pygame.image.load('resources/images/icon.png')
@@ -474,36 +574,61 @@ class SudokuGUI:
         self._menu_scr = Screen(self._strings['menu_title'], self._SCR_WIDTH, self._SCR_HEIGHT, self._ICON)
         self._game_scr = Screen(self._strings['game_title'], self._SCR_WIDTH, self._SCR_HEIGHT, self._ICON)
         self._stats_scr = Screen(self._strings['stats_title'], self._SCR_WIDTH, self._SCR_HEIGHT, self._ICON)
-        # list of screens with the corresponding loops
-        self._screens = [(self._menu_scr, self._menu_loop),
-                         (self._stats_scr, self._stats_loop),
-                         (self._game_scr, self._game_loop)]
+        # screens with the corresponding loops
+        self._screens = {self._menu_scr: self._menu_loop,
+                         self._stats_scr: self._stats_loop,
+                         self._game_scr: self._game_loop}
+        # the current screen and its loop, run by main_loop
+        self._active_screen = self._menu_scr
+        self._active_loop = self._menu_loop
         self._scr = self._menu_scr.make_current()
         self._running = True
+        # the frame rate limits (in frames per second) of the screens and of the paused game
+        self._clock = pygame.time.Clock()
+        self._FPS = 60
+        self._PAUSED_FPS = 20
+        # window events after which the window contents may be lost, so the whole display has to be updated
+        self._EXPOSE_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWSHOWN, pygame.WINDOWRESTORED)
+        # only the handled events are put on the queue (e.g. the mouse motion is read with pygame.mouse.get_pos)
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN, *self._EXPOSE_EVENTS])
 
         # sudoku board init
         self._difficulty = 0
         self._sudoku_engine = Sudoku()
 
-        # stack storing the last moves (used for undo)
-        self._last_moves = []
+        # stack storing the last moves (used for undo), the oldest moves are dropped once it is full
+        self._last_moves = deque(maxlen=512)
+
+        # the numbers completely and correctly filled on the board (None if the board has changed since the last check)
+        self._completed_nums = None
 
         # board
         board_size = 504
         self._square_side = board_size / 9
         self._selected_index = (-1, -1)
+        # the time (in ms) until which the held arrow keys don't move the selection again
+        self._arrow_cooldown_until = 0
 
         # fonts
-        self._timer_fnt = pygame.font.SysFont('tahoma', 30)
-        self._square_fnt = pygame.font.SysFont('calibri', 40)
-        self._square_notes_fnt = pygame.font.SysFont('calibri', 18)
-        self._text_fnt = pygame.font.SysFont('calibri', 40)
-        self._stats_fnt = pygame.font.SysFont('calibri', 30)
-        self._stats_fnt_b = pygame.font.SysFont('calibri', 30, bold=True)
-        self._stats_fnt_i = pygame.font.SysFont('calibri', 30, italic=True)
-
-        # sounds
-        self._click_snd = pygame.mixer.Sound('resources/sounds/click.mp3')
+        self._timer_fnt = _sysfont('tahoma', 30)
+        self._square_fnt = _sysfont('calibri', 40)
+        self._square_notes_fnt = _sysfont('calibri', 18)
+        self._text_fnt = _sysfont('calibri', 40)
+        self._stats_fnt = _sysfont('calibri', 30)
+        self._stats_fnt_b = _sysfont('calibri', 30, bold=True)
+        self._stats_fnt_i = _sysfont('calibri', 30, italic=True)
+
+        # pre-rendered numbers of the board squares (given, inputted and wrong ones) and the notes
+        self._square_nums = {color: {num: self._square_fnt.render(str(num), True, self._COLORS[color]).convert_alpha()
+                                     for num in range(1, 10)}
+                             for color in ('black', 'blue', 'darkred')}
+        self._notes_nums = {num: self._square_notes_fnt.render(str(num), True, self._COLORS['gray']).convert_alpha()
+                            for num in range(1, 10)}
+        # positions of the rendered numbers relative to the top left corner of the square
+        self._square_nums_pos = {num: (self._square_side / 2 - self._square_fnt.size(str(num))[0] / 2,
+                                       self._square_side / 2 - self._square_fnt.size(str(num))[1] / 2 + 2)
+                                 for num in range(1, 10)}
 
         # modify the board position by changing these two offsets
         self._square_offset_x = (self._SCR_WIDTH - board_size) / 2 - self._SCR_WIDTH / 16
@@ -513,10 +638,12 @@ class SudokuGUI:
         self._timer = Timer()
         self._timer_x = board_size + self._square_offset_x + 25
         self._timer_y = (self._SCR_HEIGHT - board_size) / 2
+        # the last rendered time and its surface
+        self._timer_txt = None
+        self._timer_surf = None
 
         # pause image and its position
-        self._pause_img = pygame.image.load('resources/images/pause_button.png')
-        self._pause_img = pygame.transform.scale(self._pause_img, (200, 200))
+        self._pause_img = _load_image('resources/images/pause_button.png', (200, 200))
         pause_img_offset_x = (self._square_offset_x + board_size / 2) - self._pause_img.get_width() / 2
         pause_img_offset_y = (self._square_offset_y + board_size / 2) - self._pause_img.get_height() / 2
         self._pause_img_rect = self._pause_img.get_rect().move(pause_img_offset_x, pause_img_offset_y)
@@ -538,7 +665,12 @@ class SudokuGUI:
         self._notes_mode = False
 
         # notes position withing the square
-        self._NOTES_POS = {i + 1: (self._square_side / 3 * (i % 3), self._square_side / 3 * (i // 3)) for i in range(9)}
+        self._NOTES_POS = {i + 1: (int(self._square_side / 3 * (i % 3)), int(self._square_side / 3 * (i // 3)))
+                           for i in range(9)}
+        # positions of the rendered notes relative to the top left corner of the square
+        self._notes_nums_pos = {num: (self._NOTES_POS[num][0] + self._square_notes_fnt.size(str(num))[0] / 2 + 2,
+                                      self._NOTES_POS[num][1] + self._square_notes_fnt.size(str(num))[1] / 2 - 7)
+                                for num in range(1, 10)}
 
         # notes mode button
         self._notes_mode_btn = Button(position=(self._timer_x, self._timer_y + 50),
@@ -549,6 +681,7 @@ class SudokuGUI:
         # numbers buttons
         self._numpad_size = (136, 136)
         numpad_pos = (self._timer_x, self._timer_y + 100)
+        self._numpad_pos = numpad_pos
         self._numpad_btns = [Button(position=(self._numpad_size[0] / 3 * (i % 3) + numpad_pos[0],
                                               self._numpad_size[1] / 3 * (i // 3) + numpad_pos[1]),
                                     size=tuple(x / 3 for x in self._numpad_size),
@@ -556,6 +689,8 @@ class SudokuGUI:
                                     font_size=30,
                                     border=1,
                                     center_text=True) for i in range(0, 9)]
+        # key codes of the numbers on the numpad buttons (so the number is not parsed from the text on every click)
+        self._numpad_keys = dict(zip(self._numpad_btns, self._NUM_TO_PY[1:]))
 
         # erase button
         self._erase_btn = Button(position=(numpad_pos[0], numpad_pos[1] + self._numpad_size[1] + 25),
@@ -584,10 +719,38 @@ class SudokuGUI:
                                   center_text=True)
 
         # lines used to draw the board
-        self._lines = [[((i * self._square_side + self._square_offset_x), 0 + self._square_offset_y),
-                        ((i * self._square_side + self._square_offset_x), board_size + self._square_offset_y)]
+        self._lines = [((int(i * self._square_side + self._square_offset_x), int(self._square_offset_y)),
+                        (int(i * self._square_side + self._square_offset_x), int(board_size + self._square_offset_y)))
                        for i in range(10)]
 
+        # the board grid pre-rendered on a transparent surface (with a margin for the thick lines on the edges)
+        grid_margin = 2
+        self._grid_pos = (self._square_offset_x - grid_margin, self._square_offset_y - grid_margin)
+        self._grid_surf = pygame.Surface((board_size + grid_margin * 2 + 1, board_size + grid_margin * 2 + 1),
+                                         flags=pygame.SRCALPHA)
+        self._draw_board_lines(self._grid_surf, self._grid_pos)
+        # only the outside border of the grid, shown while the game is paused
+        self._grid_border_surf = pygame.Surface(self._grid_surf.get_size(), flags=pygame.SRCALPHA)
+        self._draw_board_lines(self._grid_border_surf, self._grid_pos, only_border=True)
+
+        # background colors of the squares (selected, with the same value, wrong, intersecting and the other ones)
+        self._square_colors = tuple(self._COLORS[color] for color in ('green', 'orange', 'lightred', 'lightgreen',
+                                                                      'white'))
+
+        # the squares of the board, each of them redrawn only if its state differs from the one it was drawn in
+        self._board_surf = pygame.Surface((board_size, board_size))
+        self._board_states = [None] * 81
+
+        # areas of the game screen changed since the last frame (only they are updated on the display), the button
+        # surfaces shown on it and the paused / won state it was shown in
+        self._dirty = []
+        self._shown_surfs = {}
+        self._shown_mode = None
+        # if the whole display has to be updated in the next frame (e.g. after switching the screen)
+        self._full_update = True
+        # the state of the game screen shown in the last frame
+        self._shown_frame = None
+
         # flag determining presence of the Continue button in main menu
         self._continue = False
 
@@ -620,6 +783,8 @@ class SudokuGUI:
                                 center_text=True)
         self._menu_btns = [self._continue_btn, self._new_game_btn, self._stats_btn, self._exit_btn]
         self._update_menu_layout()
+        # if the presence of the Continue button changed and the menu has to be laid out again before it is used
+        self._menu_layout_outdated = False
 
         # language button
         language_btn_size = (60, 33)
@@ -629,12 +794,15 @@ class SudokuGUI:
                                     image_size=language_btn_size,
                                     image_path='resources/images/pol_PL.png')
 
-        # surface for the fade effect
-        self._faded_surf = pygame.Surface((self._SCR_WIDTH, self._SCR_HEIGHT), flags=pygame.SRCALPHA)
+        # surface for the fade effect (an opaque surface with the surface alpha blends much faster than with per-pixel
+        # alpha)
+        self._faded_surf = pygame.Surface((self._SCR_WIDTH, self._SCR_HEIGHT)).convert()
         self._faded_surf.set_alpha(180)
         self._faded_surf.fill(self._COLORS["black"])
         self._faded_diff_choice = False
         self._faded_win = False
+        # the faded game screen under the win screen (it doesn't change anymore, so it is blended only once)
+        self._faded_game_surf = None
 
         # difficulty buttons
         self._diff_txts = [self._strings[f'menu_diff_btn_{i}'] for i in range(4)]
@@ -672,7 +840,9 @@ class SudokuGUI:
         self._stats_btns = [self._stats_return_btn, self._stats_reset_btn]
 
         # win screen
-        self._win_surf = pygame.Surface((int(self._SCR_WIDTH * 0.7), int(self._SCR_HEIGHT * 0.7)))
+        self._win_surf = pygame.Surface((int(self._SCR_WIDTH * 0.7), int(self._SCR_HEIGHT * 0.7))).convert()
+        # the language, difficulty, time and record flag of the texts currently rendered on the win surface
+        self._win_key = None
         self._win_surf_pos = ((self._SCR_WIDTH - self._win_surf.get_width()) / 2,
                               (self._SCR_HEIGHT - self._win_surf.get_height()) / 2)
         win_return_btn_size = (300, 75)
@@ -727,21 +897,54 @@ class SudokuGUI:
         self._stats_return_btn.update_text(text=self._strings['stats_return_btn'])
         self._stats_reset_btn.update_text(text=self._strings['stats_reset_btn'])
 
-    def _change_language(self, language: str, update: bool = True):
+    @cached_property
+    def _click_snd(self) -> pygame.mixer.Sound:
+        """
+        Getter for the click sound (decoded on the first click, so it doesn't delay the start of the game)
+
+        :return: the click sound as a pygame Sound object
+        """
+        return pygame.mixer.Sound('resources/sounds/click.mp3')
+
+    @staticmethod
+    def _load_strings(language: str) -> dict:
+        """
+        Loads the in-game used strings in the given language
+
+        :param language: the language of the strings
+        :return: the dictionary of the strings
+        """
+        with open(f'resources/languages/{language}.json', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _change_language(self, language_idx: int, update: bool = True):
         """
         Changes the in-game used strings to the given language
 
-        :param language: the language to change the strings to
+        :param language_idx: the index of the language to change the strings to
         :param update: if the buttons has to be updated with the new strings (don't use it in SudokuGUI.__init__!)
         """
-        with open(f'resources/languages/{language}.json', encoding='utf-8') as f:
-            self._strings = json.load(f)
+        self._language_idx = language_idx
+        self._strings = self._language_strings[language_idx]
+        self._stats_blits = None
 
         if update:
-            self._language_btn.update_image(image_path=f'resources/images/{language}.png')
+            self._language_btn.update_image(image_path=f'resources/images/{self._languages[language_idx]}.png')
             self._update_strings()
             pygame.display.flip()
 
+    def _switch_screen(self, screen: Screen):
+        """
+        Ends the current screen and makes the given one current, together with its loop
+
+        :param screen: the screen to switch to
+        """
+        self._active_screen.end_current()
+        self._scr = screen.make_current()
+        self._active_screen = screen
+        self._active_loop = self._screens[screen]
+        self._full_update = True
+
     def _update_menu_layout(self):
         """
         Updates the main menu buttons positions depending on the presence of continue button
@@ -758,50 +961,52 @@ class SudokuGUI:
         """
         self._sudoku_engine.clear_board()
         self._sudoku_engine.generate(self._difficulty)
-        self._rects = [[SudokuSquare(rect=pygame.Rect(j * self._square_side, i * self._square_side, self._square_side,
-                                                      self._square_side)
-                                     .move(self._square_offset_x, self._square_offset_y),
-                                     color=self._COLORS['white'],
-                                     selected=False,
-                                     at_intersection=False,
-                                     same_value=False,
-                                     row=i,
-                                     col=j,
-                                     value=self._sudoku_engine.get_value(i, j))
-                        for i in range(9)] for j in range(9)]
+        # the squares are stored row by row in a single list (the square in the given row and column is at
+        # row * 9 + col)
+        self._squares = [SudokuSquare(rect=pygame.Rect(j * self._square_side, i * self._square_side, self._square_side,
+                                                       self._square_side)
+                                      .move(self._square_offset_x, self._square_offset_y),
+                                      color=self._COLORS['white'],
+                                      selected=False,
+                                      at_intersection=False,
+                                      same_value=False,
+                                      row=i,
+                                      col=j,
+                                      value=self._sudoku_engine.get_value(i, j))
+                         for i in range(9) for j in range(9)]
+        # rows, columns and 3x3 squares of the board, each of them can't contain the same number twice
+        self._units = ([tuple(self._get_square(row, col) for col in range(9)) for row in range(9)] +
+                       [tuple(self._get_square(row, col) for row in range(9)) for col in range(9)] +
+                       [tuple(self._get_square(3 * (box // 3) + i // 3, 3 * (box % 3) + i % 3) for i in range(9))
+                        for box in range(9)])
+        # indexes of the squares containing every number (indexed by the number, 0 for the empty squares)
+        self._value_squares = [set() for _ in range(10)]
+        for i, square in enumerate(self._squares):
+            self._value_squares[square.value].add(i)
+        # indexes of the squares that are selected, at the intersection with the selected one or with the same value
+        self._marked = set()
+        # if the wrong squares are marked for the current board values
+        self._wrong_checked = False
+        self._completed_nums = None
+        self._board_states = [None] * 81
+        self._faded_game_surf = None
         self._continue = False
 
-    @staticmethod
-    def _check_if_intersects(square: SudokuSquare, other: SudokuSquare) -> bool:
-        """
-        Checks if the given squares are in the same row, column or 3x3 square
-
-        :param square: the first square to check
-        :param other: the second square to check
-        :return: True if the squares intersect, False otherwise
-        """
-        # used for checking 3x3 square
-        start_row = 3 * (square.row // 3)
-        start_col = 3 * (square.col // 3)
-
-        intersects = False
-        if square.row == other.row or square.col == other.col:
-            intersects = True
-        elif other.row in range(start_row, start_row + 3) and other.col in range(start_col, start_col + 3):
-            intersects = True
-        return intersects
-
     def _check_if_same_value(self, square: SudokuSquare):
         """
-        Iterates through the whole board and finds the non-empty squares with the same value as the given square
+        Marks the non-empty squares with the same value as the given square, and the squares in the same row, column
+        or 3x3 square as the given one (the state of the squares has to be reset before)
 
         :param square: the square to compare the value of others with
         """
-        for row_other in self._rects:
-            for square_other in row_other:
-                square_other.at_intersection = self._check_if_intersects(square, square_other)
-                if square.value == square_other.value and square.value != 0:
-                    square_other.same_value = True
+        if square.value:
+            for index in self._value_squares[square.value]:
+                self._squares[index].same_value = True
+            self._marked.update(self._value_squares[square.value])
+        for index in self._INTERSECTING[square.row * 9 + square.col]:
+            self._squares[index].at_intersection = True
+        # the selected square is one of the intersecting ones, so it is marked here as well
+        self._marked.update(self._INTERSECTING[square.row * 9 + square.col])
 
     def _clear_notes(self, square: SudokuSquare):
         """
@@ -809,10 +1014,9 @@ class SudokuGUI:
 
         :param square: the square of which value will be compared to the notes of other squares
         """
-        for row_other in self._rects:
-            for square_other in row_other:
-                if self._check_if_intersects(square, square_other) and square.value in square_other.notes:
-                    square_other.notes.remove(square.value)
+        for index in self._INTERSECTING[square.row * 9 + square.col]:
+            if square.value in self._squares[index].notes:
+                self._squares[index].notes.remove(square.value)
 
     def _select_on_click(self, pos: tuple) -> tuple:
         """
@@ -822,15 +1026,14 @@ class SudokuGUI:
         :return: row and column of the square - if there is no square under the cursor, returns (-1, -1)
         """
         self._reset_state()
-        for row in self._rects:
-            for square in row:
-                if square.rect.collidepoint(pos) and not self._timer.paused:
-                    self._click_snd.play()
-                    square.selected = True
-                    selected_index = (square.row, square.col)
-                    # shows the squares with the same value based on the new selection
-                    self._check_if_same_value(square)
-                    return selected_index
+        for square in self._squares:
+            if square.rect.collidepoint(pos) and not self._timer.paused:
+                self._click_channel.play(self._click_snd)
+                square.selected = True
+                selected_index = (square.row, square.col)
+                # shows the squares with the same value based on the new selection
+                self._check_if_same_value(square)
+                return selected_index
         # if the mouse is not over any square, return the default index
         return -1, -1
 
@@ -840,13 +1043,22 @@ class SudokuGUI:
 
         :param ignore_wrong: if True, the is_wrong attribute is not changed
         """
-        for row in self._rects:
-            for square in row:
+        if ignore_wrong:
+            # only the marked squares can have any of the flags set
+            for index in self._marked:
+                square = self._squares[index]
                 square.at_intersection = False
                 square.selected = False
                 square.same_value = False
-                if not ignore_wrong:
-                    square.is_wrong = False
+        else:
+            for square in self._squares:
+                square.at_intersection = False
+                square.selected = False
+                square.same_value = False
+                square.is_wrong = False
+            self._completed_nums = None
+            self._wrong_checked = False
+        self._marked.clear()
 
     def _move_selected(self, selected_index: tuple, row_offset: int, col_offset: int) -> tuple:
         """
@@ -857,54 +1069,58 @@ class SudokuGUI:
         :param col_offset: vertical direction of new selection
         :return: row and column of newly selected square
         """
-        new_row = selected_index[0]
-        new_col = selected_index[1]
-        if row_offset:
-            # provides the right-left movement continuity
-            if new_row == 8 and row_offset > 0:
-                new_row = 0
-            elif new_row == 0 and row_offset < 0:
-                new_row = 8
-            else:
-                new_row += row_offset
-        elif col_offset:
-            # provides the top-bottom movement continuity
-            if new_col == 8 and col_offset > 0:
-                new_col = 0
-            elif new_col == 0 and col_offset < 0:
-                new_col = 8
-            else:
-                new_col += col_offset
+        # the movement wraps around the edges of the board
+        new_row = (selected_index[0] + row_offset) % 9
+        new_col = (selected_index[1] + col_offset) % 9
 
         self._get_square(*selected_index).selected = False
-        self._get_square(new_row, new_col).selected = True
+        new_square = self._get_square(new_row, new_col)
+        new_square.selected = True
 
         # updates the squares with the same value based on the new selection
-        self._check_if_same_value(self._get_square(new_row, new_col))
+        self._check_if_same_value(new_square)
         return new_row, new_col
 
     def _get_square(self, row: int, col: int) -> SudokuSquare:
         """
         Function for getting the SudokuSquare object based on the given row and column
 
-        :param col: the column of desired square
         :param row: the row of desired square
+        :param col: the column of desired square
         :return: SudokuSquare object
         """
-        return self._rects[col][row]
+        return self._squares[row * 9 + col]
+
+    def _set_value(self, square: SudokuSquare, value: int):
+        """
+        Sets the value of the given square and updates the indexes of the squares containing every number
+
+        :param square: the square to be filled
+        :param value: the value to insert into the square (0 to clear it)
+        """
+        index = square.row * 9 + square.col
+        self._value_squares[square.value].discard(index)
+        square.value = value
+        self._value_squares[value].add(index)
+        self._wrong_checked = False
 
     def _check_if_correct(self):
         """
-        Iterates over the whole board and checks if there is the same value in row, column or corresponding
-        3x3 field - if there is, it marks these squares as wrong
+        Iterates over every row, column and 3x3 field and checks if there is the same value in it - if there is, it
+        marks these squares as wrong (only if the board has changed since the last check)
         """
-        for row in self._rects:
-            for square in row:
-                for row_other in self._rects:
-                    for square_other in row_other:
-                        if self._check_if_intersects(square, square_other) and square.value == square_other.value \
-                                and square.value != 0 and square is not square_other:
-                            square.is_wrong = square_other.is_wrong = True
+        if self._wrong_checked:
+            return
+        self._wrong_checked = True
+        self._completed_nums = None
+        for unit in self._units:
+            # the first square with the given value found in the unit
+            seen = {}
+            for square in unit:
+                if square.value:
+                    other = seen.setdefault(square.value, square)
+                    if other is not square:
+                        square.is_wrong = other.is_wrong = True
 
     def _undo_move(self):
         """
@@ -914,8 +1130,24 @@ class SudokuGUI:
             last_move = self._last_moves.pop()
         except IndexError:
             return
-        self._get_square(last_move.row, last_move.col).notes = last_move.prev_notes
-        self._get_square(last_move.row, last_move.col).value = last_move.prev_number
+        square = self._get_square(last_move.row, last_move.col)
+        square.notes = last_move.prev_notes
+        self._set_value(square, last_move.prev_number)
+        self._completed_nums = None
+
+    @staticmethod
+    def _key_to_num(key: int) -> int:
+        """
+        Converts the key code to the number it represents (both the main and the numpad keys are handled)
+
+        :param key: pygame key code
+        :return: the number from range 1-9, or 0 if the key is not a number key
+        """
+        if pygame.K_1 <= key <= pygame.K_9:
+            return key - pygame.K_0
+        if pygame.K_KP1 <= key <= pygame.K_KP9:
+            return key - pygame.K_KP1 + 1
+        return 0
 
     def _key_press_handler(self, key: int, selected_index: tuple, ignore_arrows: bool = True) -> tuple:
         """
@@ -934,25 +1166,18 @@ class SudokuGUI:
             selected_square = self._get_square(*selected_index)
             offset = (0, 0)
             ignore_wrong = True
+            num = self._key_to_num(key)
             # keyboard arrows movement
             if not ignore_arrows:
-                if key == pygame.K_RIGHT:
-                    offset = (0, 1)
-                elif key == pygame.K_LEFT:
-                    offset = (0, -1)
-                elif key == pygame.K_UP:
-                    offset = (-1, 0)
-                elif key == pygame.K_DOWN:
-                    offset = (1, 0)
+                offset = self._ARROW_OFFSETS.get(key, offset)
             # number inputting
-            elif key in self._PY_TO_NUM.keys():
-                num = self._PY_TO_NUM[key]
+            elif num:
                 if selected_square.editable:
-                    self._click_snd.play()
+                    self._click_channel.play(self._click_snd)
                     # value writing
                     if not self._notes_mode:
                         prev_num = selected_square.value
-                        selected_square.value = num
+                        self._set_value(selected_square, num)
                         self._last_moves.append(Move(prev_num, selected_square.notes[:],
                                                      selected_square.row, selected_square.col))
                         selected_square.notes.clear()
@@ -973,12 +1198,12 @@ class SudokuGUI:
             # deleting numbers and notes
             elif key == pygame.K_BACKSPACE or key == pygame.K_DELETE:
                 if selected_square.editable:
-                    self._click_snd.play()
+                    self._click_channel.play(self._click_snd)
                     if selected_square.notes:
                         selected_square.notes.clear()
                     prev_num = selected_square.value
                     prev_notes = selected_square.notes[:]
-                    selected_square.value = 0
+                    self._set_value(selected_square, 0)
                     self._last_moves.append(Move(prev_num, prev_notes, selected_square.row, selected_square.col))
                     ignore_wrong = False
             self._reset_state(ignore_wrong)
@@ -987,47 +1212,61 @@ class SudokuGUI:
 
     def _movement_handler(self):
         """
-        Detects if the arrow key is pressed and provides movement
+        Detects if the arrow key is pressed and provides movement (repeated every 150 ms while the key is held)
         """
+        now = pygame.time.get_ticks()
+        if now < self._arrow_cooldown_until:
+            return
         pressed_keys = pygame.key.get_pressed()
-        arrow_keys = [pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT]
-        for key in arrow_keys:
+        for key in self._ARROW_OFFSETS:
             if pressed_keys[key]:
-                pygame.time.wait(150)
-                self._click_snd.play()
+                self._arrow_cooldown_until = now + 150
+                self._click_channel.play(self._click_snd)
                 self._selected_index = self._key_press_handler(key, self._selected_index, ignore_arrows=False)
 
-    def _draw_number(self, square):
+    def _get_numpad_button(self, pos: tuple):
         """
-        Draws the given square value on the board
+        Finds the numpad button under the given position (the button is computed from the numpad grid, so only one
+        button has to be checked for collision)
+
+        :param pos: the mouse position
+        :return: the clickable numpad button under the cursor, or None if there is no such button
+        """
+        col = int((pos[0] - self._numpad_pos[0]) // (self._numpad_size[0] / 3))
+        row = int((pos[1] - self._numpad_pos[1]) // (self._numpad_size[1] / 3))
+        if 0 <= row < 3 and 0 <= col < 3:
+            button = self._numpad_btns[row * 3 + col]
+            if button.check_collision(pos):
+                return button
+        return None
+
+    def _draw_number(self, square: SudokuSquare):
+        """
+        Draws the given square value on the board surface
 
         :param square: the square whose value is to be displayed
         """
         if square.value:
             if square.editable:
-                color = self._COLORS['blue'] if not square.is_wrong else self._COLORS['darkred']
+                color = 'blue' if not square.is_wrong else 'darkred'
             else:
-                color = self._COLORS['black']
-            num = self._square_fnt.render(str(square.value), True, color)
-            xpos = self._square_offset_x + self._square_side * square.col - self._square_fnt.size(
-                str(square.value))[0] / 2 + self._square_side / 2
-            ypos = self._square_offset_y + self._square_side * square.row - self._square_fnt.size(
-                str(square.value))[1] / 2 + self._square_side / 2 + 2
-            self._scr.blit(num, (xpos, ypos))
+                color = 'black'
+            num = self._square_nums[color][square.value]
+            xpos, ypos = self._square_nums_pos[square.value]
+            self._board_surf.blit(num, (self._square_side * square.col + xpos, self._square_side * square.row + ypos))
         elif square.notes:
-            color = self._COLORS['gray']
-            nums = [self._square_notes_fnt.render(str(note), True, color) for note in square.notes]
-            for surface, number in zip(nums, square.notes):
-                xpos = self._NOTES_POS[number][0] + self._square_offset_x + self._square_side * square.col \
-                       + self._square_notes_fnt.size(str(number))[0] / 2 + 2
-                ypos = self._NOTES_POS[number][1] + self._square_offset_y + self._square_side * square.row \
-                       + self._square_notes_fnt.size(str(number))[1] / 2 - 7
-                self._scr.blit(surface, (xpos, ypos))
+            for number in square.notes:
+                surface = self._notes_nums[number]
+                xpos, ypos = self._notes_nums_pos[number]
+                self._board_surf.blit(surface, (self._square_side * square.col + xpos,
+                                                self._square_side * square.row + ypos))
 
-    def _draw_board_lines(self, only_border: bool = False):
+    def _draw_board_lines(self, surface: pygame.Surface, offset: tuple = (0, 0), only_border: bool = False):
         """
         Draws the board grid
 
+        :param surface: the surface to draw the grid on
+        :param offset: the position of the given surface on the screen
         :param only_border: if True, only the outside borders will be drawn
         """
         for i, line in enumerate(self._lines):
@@ -1035,13 +1274,16 @@ class SudokuGUI:
                 continue
             thickness = 2 if i % 3 == 0 else 1
             # vertical lines
-            pygame.draw.line(self._scr, self._COLORS['black'], *line, width=thickness)
+            pygame.draw.line(surface, self._COLORS['black'],
+                             (line[0][0] - offset[0], line[0][1] - offset[1]),
+                             (line[1][0] - offset[0], line[1][1] - offset[1]),
+                             width=thickness)
             # horizontal lines
-            pygame.draw.line(self._scr, self._COLORS['black'],
-                             (line[0][1] - self._square_offset_y + self._square_offset_x,
-                              line[0][0] - self._square_offset_x + self._square_offset_y),
-                             (line[1][1] - self._square_offset_y + self._square_offset_x,
-                              line[0][0] - self._square_offset_x + self._square_offset_y),
+            pygame.draw.line(surface, self._COLORS['black'],
+                             (line[0][1] - self._square_offset_y + self._square_offset_x - offset[0],
+                              line[0][0] - self._square_offset_x + self._square_offset_y - offset[1]),
+                             (line[1][1] - self._square_offset_y + self._square_offset_x - offset[0],
+                              line[0][0] - self._square_offset_x + self._square_offset_y - offset[1]),
                              width=thickness)
 
     def _draw_timer(self, xpos: float, ypos: float):
@@ -1051,59 +1293,108 @@ class SudokuGUI:
         :param xpos: x position of the timer
         :param ypos: y position of the timer
         """
-        time_ = self._timer_fnt.render(self._timer.current_prettified, True, self._COLORS['black'])
-        self._scr.blit(time_, (xpos, ypos))
+        time_ = self._timer.current_prettified
+        if time_ != self._timer_txt:
+            self._timer_txt = time_
+            if self._timer_surf:
+                self._dirty.append(self._timer_surf.get_rect(topleft=(xpos, ypos)))
+            self._timer_surf = self._timer_fnt.render(time_, True, self._COLORS['black'])
+            self._dirty.append(self._timer_surf.get_rect(topleft=(xpos, ypos)))
+        self._scr.blit(self._timer_surf, (xpos, ypos))
 
-    def _draw_numpad(self):
+    def _draw_numpad(self, pos: tuple):
         """
         Draws the numpad used for inputting the numbers
+
+        :param pos: the mouse position (used for the hover effect)
         """
         completed_nums = self._check_completion()
-        for button in self._numpad_btns:
-            # if every number of one type is on the board (and every is correct),
-            # deactivate and color the corresponding buttons on the numpad
-            if int(button.text) in completed_nums:
+        # if every number of one type is on the board (and every is correct),
+        # deactivate and color the corresponding buttons on the numpad
+        for num, button in enumerate(self._numpad_btns, start=1):
+            button.clickable(num not in completed_nums)
+        # the only button which can be hovered (found from the numpad layout instead of checking every button)
+        hovered = self._get_numpad_button(pos)
+        for num, button in enumerate(self._numpad_btns, start=1):
+            if num in completed_nums:
                 button.update_text(text_color=self._COLORS["green"])
                 button.update_color(color=self._COLORS['lightgray'])
-                button.clickable(False)
             else:
                 button.update_text(text_color=self._COLORS["black"])
-                button.update_color(color=self._COLORS['white'])
-                button.clickable(True)
-            self._scr.blit(button.surface, button.position)
+                # hover effect
+                button.update_color(color=self._COLORS['lightgray'] if button is hovered else self._COLORS['white'])
+        self._scr.blits([(button.surface, button.position) for button in self._numpad_btns], doreturn=False)
+        self._mark_changed_buttons(self._numpad_btns)
 
-    def _draw_board(self):
+    def _draw_board(self, pos: tuple):
         """
         Draws the complete board on the screen
+
+        :param pos: the mouse position (used for the hover effect)
         """
         if self._timer.paused:
-            self._draw_board_lines(only_border=True)
+            self._scr.blit(self._grid_border_surf, self._grid_pos)
             self._scr.blit(self._pause_img, self._pause_img_rect)
             self._scr.blit(self._unpause_btn.surface, self._unpause_btn.position)
         else:
-            for row in self._rects:
-                for square in row:
-                    if square.selected:
-                        square.color = self._COLORS['green']
-                    elif square.same_value:
-                        square.color = self._COLORS['orange']
-                    elif square.is_wrong:
-                        square.color = self._COLORS['lightred']
-                    elif square.at_intersection:
-                        square.color = self._COLORS['lightgreen']
-                    else:
-                        square.color = self._COLORS['white']
-                    pygame.draw.rect(self._scr, square.color, square.rect)
+            green, orange, lightred, lightgreen, white = self._square_colors
+            for i, square in enumerate(self._squares):
+                if square.selected:
+                    square.color = green
+                elif square.same_value:
+                    square.color = orange
+                elif square.is_wrong:
+                    square.color = lightred
+                elif square.at_intersection:
+                    square.color = lightgreen
+                else:
+                    square.color = white
+                # redraw the square only if it looks different than in the last frame
+                state = (square.color, square.value, square.is_wrong, tuple(square.notes))
+                if state != self._board_states[i]:
+                    self._board_states[i] = state
+                    self._dirty.append(square.rect)
+                    pygame.draw.rect(self._board_surf, square.color,
+                                     square.rect.move(-self._square_offset_x, -self._square_offset_y))
                     self._draw_number(square)
-            self._draw_board_lines()
+            self._scr.blit(self._board_surf, (self._square_offset_x, self._square_offset_y))
+            self._scr.blit(self._grid_surf, self._grid_pos)
             self._scr.blit(self._pause_btn.surface, self._pause_btn.position)
             self._notes_mode_btn.update_text(text=self._get_notes_status())
             self._scr.blit(self._notes_mode_btn.surface, self._notes_mode_btn.position)
-            self._draw_numpad()
+            self._draw_numpad(pos)
             self._scr.blit(self._erase_btn.surface, self._erase_btn.position)
             self._scr.blit(self._undo_btn.surface, self._undo_btn.position)
+            self._mark_changed_buttons([self._pause_btn, self._notes_mode_btn, self._erase_btn, self._undo_btn])
         self._draw_timer(self._timer_x, self._timer_y)
         self._scr.blit(self._return_btn.surface, self._return_btn.position)
+        self._mark_changed_buttons([self._return_btn])
+
+    def _mark_changed_buttons(self, button_list: list):
+        """
+        Marks the areas of the buttons which look different than in the last frame as changed
+
+        :param button_list: the list of buttons drawn on the screen
+        """
+        for button in button_list:
+            surface = button.surface
+            if self._shown_surfs.get(button) is not surface:
+                self._shown_surfs[button] = surface
+                self._dirty.append(surface.get_rect(topleft=button.position))
+
+    def _update_display(self):
+        """
+        Updates the changed areas of the game screen on the display (or the whole display if it was switched, paused,
+        unpaused or covered with the win screen)
+        """
+        mode = (self._timer.paused, self._faded_win)
+        if self._full_update or mode != self._shown_mode:
+            self._full_update = False
+            self._shown_mode = mode
+            pygame.display.flip()
+        else:
+            pygame.display.update(self._dirty)
+        self._dirty.clear()
 
     def _button_hover(self, button_list: list, pos: tuple, reset_color: bool = True):
         """
@@ -1114,24 +1405,26 @@ class SudokuGUI:
         :param reset_color: if the background color has to be reseted from the hovered one
         """
         for button in button_list:
-            if button.check_collision(pos) and button.clickable:
+            if button.check_collision(pos):
                 button.update_color(color=self._COLORS['lightgray'])
-            if reset_color:
+            elif reset_color:
                 button.update_color(color=self._COLORS['white'])
 
     def _check_completion(self) -> list:
         """
-        Checks which numbers are completely and correctly filled on the board, and returns them
+        Checks which numbers are completely and correctly filled on the board, and returns them (the result is kept
+        until the board changes)
 
         :return: the list of correctly and completely filled numbers
         """
-        nums = {i: 0 for i in range(1, 10)}
-        for row in self._rects:
-            for square in row:
+        if self._completed_nums is None:
+            # the number of correct squares for every number (indexed by the number)
+            counts = [0] * 10
+            for square in self._squares:
                 if square.value and not square.is_wrong:
-                    nums[square.value] += 1
-        nums = [k for k, v in nums.items() if v == 9]
-        return nums
+                    counts[square.value] += 1
+            self._completed_nums = [num for num in range(1, 10) if counts[num] == 9]
+        return self._completed_nums
 
     def _check_record(self, diff: str, time_: int) -> bool:
         """
@@ -1158,9 +1451,8 @@ class SudokuGUI:
         """
         self._scr.fill(self._COLORS["white"])
         start = 1 if not self._continue else 0
-        for button in self._menu_btns[start:]:
-            self._scr.blit(button.surface, button.position)
-        self._scr.blit(self._language_btn.surface, self._language_btn.position)
+        buttons = self._menu_btns[start:] + [self._language_btn]
+        self._scr.blits([(button.surface, button.position) for button in buttons], doreturn=False)
 
     def _draw_difficulty_buttons(self):
         """
@@ -1176,6 +1468,18 @@ class SudokuGUI:
         """
         Draws the statistics on the screen
         """
+        self._scr.fill(self._COLORS["white"])
+        if self._stats_blits is None:
+            self._stats_blits = self._render_stats()
+        self._scr.blits(self._stats_blits, doreturn=False)
+        self._scr.blits([(button.surface, button.position) for button in self._stats_btns], doreturn=False)
+
+    def _render_stats(self) -> list:
+        """
+        Renders the statistics texts
+
+        :return: the list of rendered texts with their positions on the screen
+        """
         def get_best_time(difficulty: str) -> str:
             """
             Gets the best time from the games played with given difficulty
@@ -1183,7 +1487,7 @@ class SudokuGUI:
             :param difficulty: the difficulty of the played games
             :return: the best time within the given difficulty
             """
-            return Timer().prettify(min(self._stats[f'{difficulty}_times'], default=0))
+            return Timer.prettify(min(self._stats[f'{difficulty}_times'], default=0))
 
         def get_avg_time(difficulty: str) -> str:
             """
@@ -1196,7 +1500,7 @@ class SudokuGUI:
                 result = sum(self._stats[f'{difficulty}_times']) // self._stats[f'{difficulty}_count']
             else:
                 result = 0
-            return Timer().prettify(result)
+            return Timer.prettify(result)
 
         def get_games_count(difficulty: str) -> str:
             """
@@ -1207,7 +1511,7 @@ class SudokuGUI:
             """
             return str(self._stats[f'{difficulty}_count'])
 
-        self._scr.fill(self._COLORS["white"])
+        stats_blits = []
 
         # difficulty level labels
         diff_headings = [self._stats_fnt_b.render(diff, True, self._COLORS['black']) for diff in self._diff_txts]
@@ -1223,18 +1527,17 @@ class SudokuGUI:
         formulas = [get_best_time, get_avg_time, get_games_count]
         gap = 10
         for i, (diff, v) in enumerate(zip(diff_headings, self._DIFF_TO_STATS.values())):
-            diff_rect = diff.get_rect(center=(self._SCR_WIDTH / 2, diff.get_height() * 4 * i + diff.get_height()))
-            self._scr.blit(diff, diff_rect)
+            height = diff.get_height()
+            diff_rect = diff.get_rect(center=(self._SCR_WIDTH / 2, height * 4 * i + height))
+            stats_blits.append((diff, diff_rect))
             for time_, x in zip(times_headings, times_x):
-                time_rect = time_.get_rect(center=(x, diff.get_height() * 4 * i + diff.get_height() * 2 + gap))
-                self._scr.blit(time_, time_rect)
+                time_rect = time_.get_rect(center=(x, height * 4 * i + height * 2 + gap))
+                stats_blits.append((time_, time_rect))
             for formula, x in zip(formulas, times_x):
                 text = self._stats_fnt.render(formula(v), True, self._COLORS['black'])
-                text_rect = text.get_rect(center=(x, diff.get_height() * 4 * i + diff.get_height() * 3 + gap * 2))
-                self._scr.blit(text, text_rect)
-
-        for button in self._stats_btns:
-            self._scr.blit(button.surface, button.position)
+                text_rect = text.get_rect(center=(x, height * 4 * i + height * 3 + gap * 2))
+                stats_blits.append((text, text_rect))
+        return stats_blits
 
     def _create_stats(self, reset: bool = False):
         """
@@ -1243,25 +1546,57 @@ class SudokuGUI:
         :param reset: if the current stats file has to be deleted
         """
         if not os.path.exists(os.path.expanduser('~/Documents/Sudoku/statistics.json')) or reset:
-            with open(os.path.expanduser('~/Documents/Sudoku/statistics.json'), 'w+') as f:
-                statistics = {"easy_times": [],
-                              "easy_count": 0,
-                              "medium_times": [],
-                              "medium_count": 0,
-                              "hard_times": [],
-                              "hard_count": 0,
-                              "expert_times": [],
-                              "expert_count": 0, }
-                f.write(json.dumps(statistics))
-        with open(os.path.expanduser('~/Documents/Sudoku/statistics.json')) as f:
-            self._stats = json.load(f)
+            self._stats = {"easy_times": [],
+                           "easy_count": 0,
+                           "medium_times": [],
+                           "medium_count": 0,
+                           "hard_times": [],
+                           "hard_count": 0,
+                           "expert_times": [],
+                           "expert_count": 0, }
+            self._save_stats_to_file()
+        else:
+            with open(os.path.expanduser('~/Documents/Sudoku/statistics.json')) as f:
+                self._stats = json.load(f)
+        self._stats_blits = None
 
     def _save_stats_to_file(self):
         """
-        Saves the statistics to a json file
+        Saves the statistics to a json file (in the background, so the game doesn't wait for the disk)
         """
-        with open(os.path.expanduser('~/Documents/Sudoku/statistics.json'), 'w+') as f:
-            f.write(json.dumps(self._stats))
+        future = self._stats_writer.submit(self._write_stats_file, json.dumps(self._stats))
+        future.add_done_callback(self._report_stats_error)
+        self._stats_blits = None
+
+    def _report_stats_error(self, future: Future):
+        """
+        Reports the error of the failed statistics write (called by the writer thread when the write is finished)
+
+        :param future: the finished write
+        """
+        error = future.exception()
+        if error:
+            print(f'Could not save the statistics: {error}', file=sys.stderr)
+            self._stats_error = error
+
+    @staticmethod
+    def _write_stats_file(data: str):
+        """
+        Writes the given statistics to the json file, replacing it only when the whole file is written (so it is never
+        left half-written)
+
+        :param data: the statistics in the json format
+        """
+        path = os.path.expanduser('~/Documents/Sudoku/statistics.json')
+        tmp_path = path + '.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        finally:
+            # the temporary file is left only if writing or replacing has failed
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
     def _show_win_screen(self):
         """
@@ -1277,6 +1612,22 @@ class SudokuGUI:
             self._stats_to_save = False
 
         self._timer.stop()
+        # the texts are rendered only once for the finished game (the button is redrawn every frame for the hover)
+        win_key = (self._language_idx, self._difficulty, solved_time_pretty, self._new_record)
+        if win_key != self._win_key:
+            self._win_key = win_key
+            self._render_win_texts(solved_time_pretty)
+        self._win_surf.blit(self._win_return_btn.surface,
+                            tuple(x - y for x, y in zip(self._win_return_btn.position, self._win_surf_pos)))
+        self._scr.blit(self._win_surf, self._win_surf_pos)
+        self._mark_changed_buttons([self._win_return_btn])
+
+    def _render_win_texts(self, solved_time_pretty: str):
+        """
+        Renders the texts of the win screen onto its surface
+
+        :param solved_time_pretty: the time of solving the sudoku (in format mm:ss)
+        """
         self._win_surf.fill(self._COLORS["white"])
         texts = [self._text_fnt.render(self._strings[f'win_txt_0'], True, self._COLORS['black']),
                  self._text_fnt.render(self._strings[f'win_txt_1'] + self._diff_txts[self._difficulty],
@@ -1289,55 +1640,54 @@ class SudokuGUI:
         for i, text in enumerate(texts, 1):
             rect = text.get_rect(center=(self._win_surf.get_width() / 2, 50 * i))
             self._win_surf.blit(text, rect)
-        self._win_surf.blit(self._win_return_btn.surface,
-                            tuple(x - y for x, y in zip(self._win_return_btn.position, self._win_surf_pos)))
-        self._scr.blit(self._win_surf, self._win_surf_pos)
 
     def _menu_loop(self):
         """
         Displays the menu screen
         """
+        if self._menu_layout_outdated:
+            self._update_menu_layout()
+            self._menu_layout_outdated = False
         pos = pygame.mouse.get_pos()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self._running = False
+            elif event.type in self._EXPOSE_EVENTS:
+                self._full_update = True
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and not self._faded_diff_choice:
                 if self._continue_btn.check_collision(pos) and self._continue:
-                    self._click_snd.play()
-                    self._menu_scr.end_current()
-                    self._scr = self._game_scr.make_current()
+                    self._click_channel.play(self._click_snd)
+                    self._switch_screen(self._game_scr)
                     self._timer.unpause()
                 elif self._new_game_btn.check_collision(pos):
-                    self._click_snd.play()
+                    self._click_channel.play(self._click_snd)
                     self._faded_diff_choice = True
                     self._stats_to_save = True
                     self._new_record = False
                     self._last_moves.clear()
                 elif self._stats_btn.check_collision(pos):
-                    self._click_snd.play()
-                    self._menu_scr.end_current()
-                    self._scr = self._stats_scr.make_current()
+                    self._click_channel.play(self._click_snd)
+                    self._switch_screen(self._stats_scr)
                 elif self._exit_btn.check_collision(pos):
-                    self._click_snd.play()
+                    self._click_channel.play(self._click_snd)
                     self._running = False
                 elif self._language_btn.check_collision(pos):
-                    self._click_snd.play()
-                    self._change_language(next(self._languages))
+                    self._click_channel.play(self._click_snd)
+                    self._change_language((self._language_idx + 1) % len(self._languages))
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self._faded_diff_choice:
                 for diff, button in enumerate(self._diff_btns):
                     if button.check_collision(pos):
-                        self._click_snd.play()
+                        self._click_channel.play(self._click_snd)
                         self._difficulty = diff
                         self._generate_board()
-                        self._menu_scr.end_current()
-                        self._scr = self._game_scr.make_current()
+                        self._switch_screen(self._game_scr)
                         self._timer.reset()
                         self._timer.unpause()
                         self._faded_diff_choice = False
                         self._faded_win = False
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
-                    self._click_snd.play()
+                    self._click_channel.play(self._click_snd)
                     self._faded_diff_choice = False
 
         self._scr.fill(self._COLORS["white"])
@@ -1360,13 +1710,14 @@ class SudokuGUI:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self._running = False
+            elif event.type in self._EXPOSE_EVENTS:
+                self._full_update = True
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 if self._stats_return_btn.check_collision(pos):
-                    self._click_snd.play()
-                    self._stats_scr.end_current()
-                    self._scr = self._menu_scr.make_current()
+                    self._click_channel.play(self._click_snd)
+                    self._switch_screen(self._menu_scr)
                 elif self._stats_reset_btn.check_collision(pos):
-                    self._click_snd.play()
+                    self._click_channel.play(self._click_snd)
                     self._create_stats(reset=True)
 
         self._button_hover(self._stats_btns, pos)
@@ -1379,71 +1730,85 @@ class SudokuGUI:
         """
         Displays the game screen
         """
+        self._timer.tick(pygame.time.get_ticks())
         self._movement_handler()
         sidebar_clicked = False
         pos = pygame.mouse.get_pos()
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        for event in events:
             if event.type == pygame.QUIT:
                 self._running = False
+            elif event.type in self._EXPOSE_EVENTS:
+                self._full_update = True
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and not self._faded_win:
-                for button in self._numpad_btns:
-                    if button.check_collision(pos):
-                        self._click_snd.play()
-                        self._key_press_handler(self._NUM_TO_PY[int(button.text)], self._selected_index)
-                        self._check_if_correct()
-                        sidebar_clicked = True
+                button = self._get_numpad_button(pos)
+                if button:
+                    self._click_channel.play(self._click_snd)
+                    self._key_press_handler(self._numpad_keys[button], self._selected_index)
+                    self._check_if_correct()
+                    sidebar_clicked = True
                 if self._erase_btn.check_collision(pos) and not self._timer.paused:
-                    self._click_snd.play()
+                    self._click_channel.play(self._click_snd)
                     self._key_press_handler(pygame.K_BACKSPACE, self._selected_index)
                     sidebar_clicked = True
                 elif self._undo_btn.check_collision(pos) and not self._timer.paused:
-                    self._click_snd.play()
+                    self._click_channel.play(self._click_snd)
                     self._undo_move()
                     self._reset_state(ignore_wrong=False)
                     self._check_if_correct()
                 elif self._pause_btn.check_collision(pos) and not self._timer.paused:
-                    self._click_snd.play()
+                    self._click_channel.play(self._click_snd)
                     self._timer.pause()
                 elif self._unpause_btn.check_collision(pos) and self._timer.paused:
-                    self._click_snd.play()
+                    self._click_channel.play(self._click_snd)
                     self._timer.unpause()
                 elif self._notes_mode_btn.check_collision(pos) and not self._timer.paused:
-                    self._click_snd.play()
+                    self._click_channel.play(self._click_snd)
                     self._notes_mode = not self._notes_mode
                 elif self._return_btn.check_collision(pos):
-                    self._click_snd.play()
-                    self._game_scr.end_current()
-                    self._scr = self._menu_scr.make_current()
+                    self._click_channel.play(self._click_snd)
+                    self._switch_screen(self._menu_scr)
                     self._timer.pause()
                     self._continue = True
-                    self._update_menu_layout()
+                    self._menu_layout_outdated = True
                 self._selected_index = self._select_on_click(pos) if not sidebar_clicked else self._selected_index
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self._faded_win:
                 if self._win_return_btn.check_collision(pos):
-                    self._click_snd.play()
+                    self._click_channel.play(self._click_snd)
                     self._faded_win = False
-                    self._game_scr.end_current()
-                    self._scr = self._menu_scr.make_current()
+                    self._switch_screen(self._menu_scr)
                     self._continue = False
-                    self._update_menu_layout()
+                    self._menu_layout_outdated = True
             elif event.type == pygame.KEYDOWN and not self._faded_win:
                 self._selected_index = self._key_press_handler(event.key, self._selected_index)
                 self._check_if_correct()
 
-        self._scr.fill(self._COLORS['white'])
-        self._draw_board()
+        # everything visible on the game screen is determined by this state (the rest changes only on events), so
+        # the identical frame is neither drawn nor shown again - unless the window was exposed and has to be repainted
+        frame = (pos, self._selected_index, self._timer.current_prettified, self._timer.paused, self._faded_win,
+                 self._return_btn.surface, self._win_return_btn.surface)
+        if not events and not self._full_update and frame == self._shown_frame:
+            return
+        self._shown_frame = frame
 
-        if self._check_win():
-            self._faded_win = True
+        if self._faded_win and self._faded_game_surf:
+            self._scr.blit(self._faded_game_surf, (0, 0))
         else:
-            self._button_hover(self._numpad_btns, pos, False)
-            self._button_hover([self._return_btn], pos)
+            self._scr.fill(self._COLORS['white'])
+            self._draw_board(pos)
+
+            if self._check_win():
+                self._faded_win = True
+            else:
+                self._button_hover([self._return_btn], pos)
+            if self._faded_win:
+                self._scr.blit(self._faded_surf, (0, 0))
+                self._faded_game_surf = self._scr.copy()
         if self._faded_win:
-            self._scr.blit(self._faded_surf, (0, 0))
             self._show_win_screen()
             self._button_hover([self._win_return_btn], pos)
 
-        pygame.display.flip()
+        self._update_display()
     pygame.quit()
 
     def main_loop(self):
@@ -1451,9 +1816,14 @@ class SudokuGUI:
         Main GUI handler
         """
         while self._running:
-            for screen, loop in self._screens:
-                if screen.check_if_current():
-                    loop()
+            self._active_loop()
+            # nothing moves on the paused game screen, so it is refreshed less often
+            self._clock.tick(self._PAUSED_FPS if self._game_scr.check_if_current() and self._timer.paused
+                             else self._FPS)
+        # wait for the pending statistics writes before closing
+        self._stats_writer.shutdown(wait=True)
+        if self._stats_error:
+            raise self._stats_error
 
 
 if __name__ == '__main__':